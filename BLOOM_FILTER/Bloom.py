@@ -2,26 +2,17 @@ import random
 
 #this is a simple implementation of bloom filter on 
 
-bloom =[0]*32
+bloom = 0  # 32-bit table packed into one int, bit h set for every hash h seen
 def bloomfilter(a):
+    global bloom
     # 3 hash functions
     hash1 = (a * 7) % 32
     hash2=(a*(a-3))%32
     hash3=(a*pow(a,2))%32
-    count =0
-    if bloom[hash1]==1:
-        count+=1
-    if bloom[hash2]==1:
-        count+=1
-    if bloom[hash3]==1:
-        count+=1
-    bloom[hash1]=1
-    bloom[hash2]=1
-    bloom[hash3]=1
-    if count==3:
-        print("100% Present")
-    else:
-        print("Maybe Present")
+    mask = (1 << hash1) | (1 << hash2) | (1 << hash3)
+    present = (bloom & mask) == mask
+    bloom |= mask
+    print(("Maybe Present", "100% Present")[present])
 
 if __name__=="__main__":
     for i in range(10):
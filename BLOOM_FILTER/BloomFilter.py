@@ -1,16 +1,191 @@
 import mmh3  # MurmurHash3 for better hash functions
 import math
 import csv
-from typing import List, Optional
+import numpy as np
+from typing import Callable, Iterator, List, Optional, Tuple
+from functools import lru_cache
 import logging
 from pathlib import Path
+from itertools import islice
+
+try:
+    from numba import njit, types
+    from numba.core import cgutils
+    from numba.extending import intrinsic
+    from llvmlite import ir
+except ImportError:  # numba is optional; fall back to the plain Python loops
+    intrinsic = None
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the csv module
+    pa = pa_csv = None
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def _encode(item) -> bytes:
+    """
+    Convert an item to the UTF-8 bytes that get hashed. bytes pass through
+    as-is, so b'x' and 'x' hash alike.
+    """
+    return item if isinstance(item, bytes) else str(item).encode('utf-8')
+
+def _read_csv_batches(file_path: Path, column_name: Optional[str],
+                      batch_size: int) -> Iterator[List[str]]:
+    """
+    Yield the values of one CSV column in lists of at most batch_size.
+    Uses pyarrow's C++ reader when it is installed, otherwise csv. Without
+    column_name the first column is used and, as with csv.reader, the header
+    row is read as data.
+    """
+    read = 0
+    if pa_csv is not None:
+        column = column_name or 'f0'
+        read_options = pa_csv.ReadOptions(autogenerate_column_names=not column_name)
+        convert_options = pa_csv.ConvertOptions(include_columns=[column],
+                                                column_types={column: pa.string()})
+        try:
+            reader = pa_csv.open_csv(file_path, read_options=read_options,
+                                     convert_options=convert_options)
+            for record_batch in reader:
+                values = record_batch.column(0).to_pylist()
+                for start in range(0, len(values), batch_size):
+                    batch = values[start:start + batch_size]
+                    read += len(batch)
+                    yield batch
+            return
+        except pa.ArrowKeyError:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+        except pa.ArrowInvalid:
+            # pyarrow rejects rows with the wrong number of fields, which csv
+            # reads (a short row gives None for a missing column), so csv
+            # takes over from the first value pyarrow did not yield
+            pass
+
+    with open(file_path, 'r') as file:
+        reader = csv.DictReader(file) if column_name else csv.reader(file)
+        
+        if column_name and column_name not in reader.fieldnames:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+
+        values = islice((row[column_name] if column_name else row[0] for row in reader), read, None)
+        batch = list(islice(values, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(values, batch_size))
+
+_BLOCK_BITS = 512
+_PREFETCH_DISTANCE = 16  # items looked ahead by check_batch
+_MAX_PROBES = 16
+# Probe i uses the top 9 bits of h * C**(i + 1) mod 2**64 (C the 64-bit golden
+# ratio). Multipliers are stored signed so numba keeps the arithmetic in
+# wrapping int64; only the low 64 bits of the product matter either way.
+_LANE_SHIFT = 64 - (_BLOCK_BITS.bit_length() - 1)
+_PROBE_MULTIPLIERS = tuple(
+    (v + (1 << 63)) % (1 << 64) - (1 << 63)
+    for v in (pow(0x9E3779B97F4A7C15, i + 1, 1 << 64) for i in range(_MAX_PROBES))
+)
+
+if intrinsic is not None:
+    @intrinsic
+    def _prefetch(typingctx, arr, idx):
+        """Emit llvm.prefetch (read, no temporal locality) for &arr[idx]."""
+        def codegen(context, builder, signature, args):
+            ary = context.make_array(signature.args[0])(context, builder, args[0])
+            ptr = cgutils.get_item_pointer(context, builder, signature.args[0], ary, [args[1]])
+            ptr = builder.bitcast(ptr, ir.IntType(8).as_pointer())
+            i32 = ir.IntType(32)
+            fnty = ir.FunctionType(ir.VoidType(), [ptr.type, i32, i32, i32])
+            # Let llvmlite mangle the overload (p0i8 or p0) from the pointer
+            # type numba really emits; the LLVM version alone does not decide it
+            fn = builder.module.declare_intrinsic("llvm.prefetch", [ptr.type], fnty)
+            builder.call(fn, [ptr, i32(0), i32(0), i32(1)])
+            return context.get_dummy_value()
+        return types.void(arr, idx), codegen
+else:
+    def _prefetch(arr, idx):
+        """No-op without numba; CPython cannot issue prefetches."""
+
+@lru_cache(maxsize=None)
+def _specialize_kernels(k: int) -> Tuple[Callable, Callable]:
+    """
+    Build add/check kernels for a fixed hash count with the k probes unrolled
+    into straight-line code, so there is no loop or k argument left at runtime.
+    The source is generated per k and compiled once; filters with the same k
+    share the result.
+    
+    Returns:
+        Tuple of (add(bits, base, h), check(bits, base, h) -> bool)
+    """
+    lane_mask = _BLOCK_BITS - 1
+    probes = [f"    p{i} = base + (((h * {_PROBE_MULTIPLIERS[i]}) >> {_LANE_SHIFT}) & {lane_mask})\n"
+              for i in range(k)]
+    add_src = ("def _add_inner(bits, base, h):\n"
+               + "".join(probes)
+               + "".join(f"    bits[p{i} >> 3] |= 1 << (p{i} & 7)\n" for i in range(k)))
+    # AND-reduce rather than return early: all k bits share one cache line,
+    # so short-circuiting saves no memory traffic and only adds branches
+    check_src = ("def _check_inner(bits, base, h):\n"
+                 + "".join(probes)
+                 + "    return ("
+                 + " & ".join(f"(bits[p{i} >> 3] >> (p{i} & 7))" for i in range(k))
+                 + ") & 1 == 1\n")
+    namespace = {}
+    exec(add_src + check_src, namespace)
+    # Generated source has no file behind it, so numba's on-disk cache cannot be used
+    return (njit(boundscheck=False)(namespace['_add_inner']),
+            njit(boundscheck=False)(namespace['_check_inner']))
+
+@njit(cache=True, boundscheck=False)
+def _add_if_absent_inner(bits, base, h, k):
+    """Set the item's k bits and report whether all of them were already set."""
+    present = True
+    for i in range(k):
+        p = base + (((h * _PROBE_MULTIPLIERS[i]) >> _LANE_SHIFT) & (_BLOCK_BITS - 1))
+        bit = 1 << (p & 7)
+        if not bits[p >> 3] & bit:
+            present = False
+            bits[p >> 3] |= bit
+    return present
+
+@njit(cache=True, boundscheck=False)
+def _check_batch_inner(bits, bases, hs, k):
+    """
+    Test many items, prefetching the block of the item _PREFETCH_DISTANCE
+    ahead so its cache miss overlaps with testing the current one.
+    """
+    n = bases.shape[0]
+    result = np.empty(n, dtype=np.bool_)
+    for j in range(min(_PREFETCH_DISTANCE, n)):
+        _prefetch(bits, bases[j] >> 3)
+    for j in range(n):
+        if j + _PREFETCH_DISTANCE < n:
+            _prefetch(bits, bases[j + _PREFETCH_DISTANCE] >> 3)
+        present = 1
+        for i in range(k):
+            p = bases[j] + (((hs[j] * _PROBE_MULTIPLIERS[i]) >> _LANE_SHIFT) & (_BLOCK_BITS - 1))
+            present &= bits[p >> 3] >> (p & 7)
+        result[j] = present & 1 == 1
+    return result
+
 class BloomFilter:
+    # Blocked layout: every item's k bits live in one 64-byte (512-bit) block,
+    # so add/check touch a single cache line instead of k random ones.
+    BLOCK_BITS = _BLOCK_BITS
+    BLOCK_BYTES = BLOCK_BITS >> 3
+    # Probes beyond this buy almost nothing inside one 512-bit block and each
+    # one is an unrolled line in the generated kernels
+    MAX_HASH_COUNT = _MAX_PROBES
+
     def __init__(self, expected_elements: int, false_positive_rate: float = 0.01):
         """
         Initialize Bloom Filter with optimal size and number of hash functions.
@@ -19,42 +194,137 @@ class BloomFilter:
             expected_elements: Expected number of elements to be inserted
             false_positive_rate: Desired false positive probability
         """
+        self.hash_count = self._calculate_optimal_hash_count(expected_elements, false_positive_rate)
         self.size = self._calculate_optimal_size(expected_elements, false_positive_rate)
-        self.hash_count = self._calculate_optimal_hash_count(expected_elements)
-        self.bit_array = [0] * self.size
+        self.num_blocks = self.size // self.BLOCK_BITS
+        # Power-of-two size: h & mask replaces h % size, and clearing the
+        # lane bits leaves the first bit of the block directly
+        self.mask = self.size - 1
+        self.block_mask = self.mask & ~(self.BLOCK_BITS - 1)
+        # Packed bit array: bit i lives in byte i >> 3 at position i & 7.
+        # Over-allocate and slice so every block starts on a 64-byte boundary
+        # and really is a single cache line.
+        nbytes = self.num_blocks * self.BLOCK_BYTES
+        buffer = np.zeros(nbytes + self.BLOCK_BYTES, dtype=np.uint8)
+        offset = -buffer.ctypes.data % self.BLOCK_BYTES
+        self.bit_array = buffer[offset:offset + nbytes]
         self.elements_count = 0
+        self._add_inner, self._check_inner = _specialize_kernels(self.hash_count)
         
-        logging.info(f"Initialized Bloom Filter with size: {self.size}, hash functions: {self.hash_count}")
+        logging.info(f"Initialized Bloom Filter with size: {self.size}, hash functions: {self.hash_count}, "
+                     f"blocks: {self.num_blocks}")
+
+    @staticmethod
+    def _calculate_optimal_bits(n: int, p: float) -> float:
+        """Calculate the unrounded optimal bit array size."""
+        return -(n * math.log(p)) / (math.log(2) ** 2)
+
+    @classmethod
+    def _blocked_false_positive_rate(cls, n: float, m: float, k: int) -> float:
+        """
+        False positive rate of a blocked filter with n items in m bits.
+        Block loads are Poisson with mean n * BLOCK_BITS / m, and a block
+        holding i items answers falsely with probability
+        (1 - (1 - 1/B)^(k*i))^k, since each item sets k independently placed
+        bits of its B-bit block. Averaging over the load accounts for
+        overfull blocks, which the unblocked formula ignores.
+        """
+        load = n * cls.BLOCK_BITS / m
+        if load == 0:
+            return 0.0
+        bit_clear = (1 - 1 / cls.BLOCK_BITS) ** k
+        rate = 0.0
+        for i in range(1, math.ceil(load + 12 * math.sqrt(load) + 20)):
+            poisson = math.exp(i * math.log(load) - load - math.lgamma(i + 1))
+            rate += poisson * (1 - bit_clear ** i) ** k
+        return rate
 
     def _calculate_optimal_size(self, n: int, p: float) -> int:
-        """Calculate optimal bit array size."""
-        m = -(n * math.log(p)) / (math.log(2) ** 2)
-        return math.ceil(m)
+        """
+        Calculate the bit array size, rounded up to a power of two of at least one block.
+        Starts from the unblocked optimum and adds bits per key until the
+        blocked model meets p, since uneven block loads raise the rate.
+        """
+        bits_per_key = self._calculate_optimal_bits(n, p) / n
+        while self._blocked_false_positive_rate(n, n * bits_per_key, self.hash_count) > p:
+            bits_per_key += 0.25
+        m = n * bits_per_key
+        return 1 << max(self.BLOCK_BITS.bit_length() - 1, math.ceil(math.log2(m)))
 
-    def _calculate_optimal_hash_count(self, n: int) -> int:
-        """Calculate optimal number of hash functions."""
-        k = (self.size / n) * math.log(2)
-        return math.ceil(k)
+    def _calculate_optimal_hash_count(self, n: int, p: float) -> int:
+        """
+        Calculate optimal number of hash functions.
+        Uses the unrounded optimal size: the power-of-two rounding and the
+        one-block minimum only add spare bits and should not add probes.
+        """
+        k = (self._calculate_optimal_bits(n, p) / n) * math.log(2)
+        return min(self.MAX_HASH_COUNT, max(1, math.ceil(k)))
 
-    def _get_hash_values(self, item: str) -> List[int]:
+    def _get_hash_values(self, item: str) -> Tuple[int, int]:
         """
-        Generate hash values for an item using MurmurHash3.
-        Uses double hashing technique to generate multiple hash values.
+        Generate the block and the in-block probe seed for an item.
+        A single 128-bit MurmurHash3 call yields (h1, h2): bits 9 and up of h1
+        pick the block and probe i inside it is the top 9 bits of
+        h2 * C**(i + 1) mod 2**64. The probes are close to independent, so
+        the blocked false positive model holds. Hashes are signed so they
+        stay int64 in the kernels.
+        
+        Returns:
+            Tuple of (first bit of the block, probe seed)
         """
-        hash_values = []
-        for seed in range(self.hash_count):
-           # hash_val = mmh3.hash(str(item), seed) % self.size
-            hash_val=mmh3.hash(str(item),seed)%self.size
-            hash_values.append(abs(hash_val))
-        return hash_values
+        h1, h2 = mmh3.hash64(_encode(item), signed=True)
+        return h1 & self.block_mask, h2
 
     def add(self, item: str) -> None:
         """Add an item to the Bloom filter."""
-        hash_values = self._get_hash_values(item)
-        for hash_val in hash_values:
-            self.bit_array[hash_val] = 1
+        base, h = self._get_hash_values(item)
+        self._add_inner(self.bit_array, base, h)
         self.elements_count += 1
 
+    def add_if_absent(self, item: str) -> bool:
+        """
+        Add an item and report whether it was probably present beforehand.
+        Does one hash and probe pass instead of a check followed by an add,
+        which suits deduplicating a stream.
+        
+        Returns:
+            bool: False if the item was definitely new, True if it was
+                  probably already in the set
+        """
+        base, h = self._get_hash_values(item)
+        present = _add_if_absent_inner(self.bit_array, base, h, self.hash_count)
+        if not present:
+            self.elements_count += 1
+        return present
+
+    def _get_batch_hash_values(self, items: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _get_hash_values: int64 arrays of block bases and probe seeds."""
+        hashes = np.fromiter(
+            (mmh3.hash64(_encode(item), signed=True) for item in items),
+            dtype=[('h1', np.int64), ('h2', np.int64)],
+            count=len(items),
+        )
+        return hashes['h1'] & self.block_mask, hashes['h2']
+
+    def _get_batch_positions(self, items: List[str]) -> np.ndarray:
+        """
+        Return an (N, k) array of absolute bit positions, matching what the
+        scalar path sets for each item.
+        """
+        bases, hs = self._get_batch_hash_values(items)
+        # int64 products wrap like the kernels' do
+        products = hs[:, None] * np.array(_PROBE_MULTIPLIERS[:self.hash_count], dtype=np.int64)
+        lanes = (products >> _LANE_SHIFT) & (self.BLOCK_BITS - 1)
+        return bases[:, None] | lanes
+
+    def add_batch(self, items: List[str]) -> None:
+        """Add many items at once, hashing in Python but setting bits in numpy."""
+        if not items:
+            return
+        positions = self._get_batch_positions(items).ravel()
+        np.bitwise_or.at(self.bit_array, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.elements_count += len(items)
+
     def check(self, item: str) -> str:
         """
         Check if an item might be in the set.
@@ -63,52 +333,56 @@ class BloomFilter:
             str: "Definitely not present" if item is definitely not in set,
                  "Probably present" if item might be in set
         """
-        hash_values = self._get_hash_values(item)
-        for hash_val in hash_values:
-            if self.bit_array[hash_val] == 0:
-                return "Definitely not present"
+        base, h = self._get_hash_values(item)
+        if not self._check_inner(self.bit_array, base, h):
+            return "Definitely not present"
         return "Probably present"
 
+    def check_batch(self, items: List[str]) -> np.ndarray:
+        """
+        Check many items at once.
+        Each item needs exactly one block, so items are the loop and the next
+        items' blocks are prefetched while the current one is tested, which
+        hides memory latency for filters larger than the CPU caches.
+        
+        Returns:
+            np.ndarray: Boolean array, True where the item is probably present
+                        and False where it is definitely not present
+        """
+        bases, hs = self._get_batch_hash_values(items)
+        return _check_batch_inner(self.bit_array, bases, hs, self.hash_count)
+
     def get_current_false_positive_rate(self) -> float:
         """Calculate the current false positive rate based on elements added."""
-        if self.elements_count == 0:
-            return 0.0
-        return (1 - math.exp(-self.hash_count * self.elements_count / self.size)) ** self.hash_count
+        return self._blocked_false_positive_rate(self.elements_count, self.size, self.hash_count)
 
 class BloomFilterCSVHandler:
     def __init__(self, expected_elements: int, false_positive_rate: float = 0.01):
         self.bloom_filter = BloomFilter(expected_elements, false_positive_rate)
 
-    def process_csv(self, file_path: str, column_name: Optional[str] = None) -> None:
+    def process_csv(self, file_path: str, column_name: Optional[str] = None,
+                    batch_size: int = 10000) -> None:
         """
         Process CSV file and add items to Bloom filter.
         
         Args:
             file_path: Path to CSV file
             column_name: Name of column to process. If None, processes first column
+            batch_size: Number of rows hashed and inserted together
         """
         try:
             file_path = Path(file_path)
             if not file_path.exists():
                 raise FileNotFoundError(f"CSV file not found: {file_path}")
 
-            with open(file_path, 'r') as file:
-                reader = csv.DictReader(file) if column_name else csv.reader(file)
-                
-                if column_name and column_name not in reader.fieldnames:
-                    raise ValueError(f"Column '{column_name}' not found in CSV file")
-
-                processed = 0
-                for row in reader:
-                    value = row[column_name] if column_name else row[0]
-                    self.bloom_filter.add(str(value))
-                    processed += 1
-                    
-                    if processed % 10000 == 0:
-                        logging.info(f"Processed {processed} rows")
-
-                logging.info(f"Finished processing {processed} rows")
-                logging.info(f"Current false positive rate: {self.bloom_filter.get_current_false_positive_rate():.4f}")
+            processed = 0
+            for batch in _read_csv_batches(file_path, column_name, batch_size):
+                self.bloom_filter.add_batch(batch)
+                processed += len(batch)
+                logging.info(f"Processed {processed} rows")
+
+            logging.info(f"Finished processing {processed} rows")
+            logging.info(f"Current false positive rate: {self.bloom_filter.get_current_false_positive_rate():.4f}")
 
         except Exception as e:
             logging.error(f"Error processing CSV file: {str(e)}")
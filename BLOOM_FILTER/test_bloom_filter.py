@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from BloomFilter import BloomFilter, _check_batch_inner, _read_csv_batches
+
+
+def _items(prefix, n):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def test_check_batch_compiles_under_numba_and_matches_check():
+    pytest.importorskip("numba")
+    from numba.core.registry import CPUDispatcher
+    assert isinstance(_check_batch_inner, CPUDispatcher)
+
+    bf = BloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    added = _items("in", 500)
+    for item in added:
+        bf.add(item)
+    queries = added + _items("out", 500)
+
+    result = bf.check_batch(queries)
+
+    assert result.dtype == bool and result.shape == (len(queries),)
+    assert result[:len(added)].all()
+    assert list(result) == [bf.check(q) == "Probably present" for q in queries]
+
+
+def test_add_batch_matches_add():
+    items = _items("item", 2000)
+    scalar = BloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    batch = BloomFilter(expected_elements=1000, false_positive_rate=0.01)
+    for item in items:
+        scalar.add(item)
+    batch.add_batch(items)
+
+    np.testing.assert_array_equal(scalar.bit_array, batch.bit_array)
+    assert scalar.elements_count == batch.elements_count
+
+
+@pytest.mark.parametrize("n, p, k", [(1000000, 0.01, 7), (10, 0.01, 7), (1, 0.01, 7),
+                                     (1000, 1e-9, BloomFilter.MAX_HASH_COUNT)])
+def test_hash_count_ignores_size_rounding(n, p, k):
+    assert BloomFilter(n, p).hash_count == k
+
+
+def test_measured_false_positive_rate_meets_target():
+    # 12996 items at p=0.01 fill 2**17 bits almost exactly, so the power-of-two
+    # rounding leaves no slack and the blocked sizing itself has to meet p
+    n, p = 12996, 0.01
+    bf = BloomFilter(expected_elements=n, false_positive_rate=p)
+    assert bf.size == 1 << 17
+    bf.add_batch(_items("in", n))
+
+    measured = bf.check_batch(_items("out", 200000)).mean()
+
+    assert measured <= p
+    assert bf.get_current_false_positive_rate() == pytest.approx(measured, rel=0.1)
+
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+@pytest.mark.parametrize("column_name, tail", [(None, ["1", "3", "5"]), ("", ["1", "3", "5"]),
+                                               ("a", ["1", "3", "5"]), ("b", ["2", None, "6"])])
+def test_read_csv_batches_handles_ragged_rows(tmp_path, monkeypatch, use_pyarrow, column_name, tail):
+    if use_pyarrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr("BloomFilter.pa_csv", None)
+    # Over a megabyte (one pyarrow block) before the short row, so csv has to resume mid-file
+    rows = 40000
+    path = tmp_path / "ragged.csv"
+    path.write_text("a,b\n" + "".join(f"{i:030d},{i}\n" for i in range(rows)) + "1,2\n3\n5,6\n")
+
+    values = [v for batch in _read_csv_batches(path, column_name, 1000) for v in batch]
+
+    header = 0 if column_name else 1
+    assert len(values) == header + rows + 3
+    assert values[-3:] == tail
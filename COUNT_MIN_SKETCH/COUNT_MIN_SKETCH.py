@@ -2,11 +2,18 @@ import mmh3  # MurmurHash3 for better hash functions
 import math
 import logging
 import numpy as np
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 import sys
 import csv
 from pathlib import Path
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the csv module
+    pa = pa_csv = None
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +21,57 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def _encode(item) -> bytes:
+    """
+    Convert an item to the UTF-8 bytes that get hashed. bytes pass through
+    as-is, so b'x' and 'x' hash alike.
+    """
+    return item if isinstance(item, bytes) else str(item).encode('utf-8')
+
+def _read_csv_batches(file_path: Path, column_name: Optional[str],
+                      batch_size: int) -> Iterator[List[str]]:
+    """
+    Yield the values of one CSV column in lists of at most batch_size.
+    Uses pyarrow's C++ reader when it is installed, otherwise csv. Without
+    column_name the first column is used and, as with csv.reader, the header
+    row is read as data.
+    """
+    read = 0
+    if pa_csv is not None:
+        column = column_name or 'f0'
+        read_options = pa_csv.ReadOptions(autogenerate_column_names=not column_name)
+        convert_options = pa_csv.ConvertOptions(include_columns=[column],
+                                                column_types={column: pa.string()})
+        try:
+            reader = pa_csv.open_csv(file_path, read_options=read_options,
+                                     convert_options=convert_options)
+            for record_batch in reader:
+                values = record_batch.column(0).to_pylist()
+                for start in range(0, len(values), batch_size):
+                    batch = values[start:start + batch_size]
+                    read += len(batch)
+                    yield batch
+            return
+        except pa.ArrowKeyError:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+        except pa.ArrowInvalid:
+            # pyarrow rejects rows with the wrong number of fields, which csv
+            # reads (a short row gives None for a missing column), so csv
+            # takes over from the first value pyarrow did not yield
+            pass
+
+    with open(file_path, 'r') as file:
+        reader = csv.DictReader(file) if column_name else csv.reader(file)
+        
+        if column_name and column_name not in reader.fieldnames:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+
+        values = islice((row[column_name] if column_name else row[0] for row in reader), read, None)
+        batch = list(islice(values, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(values, batch_size))
+
 @dataclass
 class CMSParameters:
     """Parameters for Count-Min Sketch initialization."""
@@ -44,8 +102,20 @@ class CMSParameters:
 class CountMinSketch:
     """
     Count-Min Sketch implementation for approximate frequency counting.
+    
+    Uses a cache-line layout (as in Caffeine's CountMin4): each item maps to
+    a group of ceil(depth / 8) adjacent 64-byte blocks and up to 8 of its
+    depth counters are picked inside each block, so an update or query
+    touches one cache line, or a few sequential ones for very small delta.
     """
     
+    BLOCK_SIZE = 8  # int64 counters per 64-byte block
+    LANE_BITS = 3  # log2(BLOCK_SIZE)
+    # Each block in a group gets its own lane seed from the top 6 bits of
+    # h2 * C**j mod 2**64 (C the 64-bit golden ratio), so rows in different
+    # blocks of the group do not collide together
+    _SEED_MULTIPLIER = 0x9E3779B97F4A7C15
+    
     def __init__(self, params: CMSParameters):
         """
         Initialize Count-Min Sketch with given parameters.
@@ -56,28 +126,79 @@ class CountMinSketch:
         self.params = params
         self.width = params.width
         self.depth = params.depth
-        self.sketch = np.zeros((self.depth, self.width), dtype=np.int64)
+        # At least as many counters as a depth x width sketch. The group is
+        # picked with a multiply-shift range reduction, which needs neither
+        # a modulo nor a power-of-two group count.
+        self.group_blocks = math.ceil(self.depth / self.BLOCK_SIZE)
+        self.num_groups = math.ceil(self.width * self.depth / (self.group_blocks * self.BLOCK_SIZE))
+        self.num_blocks = self.num_groups * self.group_blocks
+        self.sketch = np.zeros((self.num_blocks, self.BLOCK_SIZE), dtype=np.int64)
+        # Row i lives in block i // BLOCK_SIZE of the group at position i % BLOCK_SIZE
+        self._row_blocks = np.arange(self.depth) // self.BLOCK_SIZE
+        self._row_positions = np.arange(self.depth) % self.BLOCK_SIZE
+        self._seed_multipliers = [pow(self._SEED_MULTIPLIER, j, 1 << 64)
+                                  for j in range(self.group_blocks)]
         self.total_items = 0
         
-        logging.info(f"Initialized Count-Min Sketch with width={self.width}, depth={self.depth}")
+        logging.info(f"Initialized Count-Min Sketch with width={self.width}, depth={self.depth}, "
+                     f"blocks={self.num_blocks}")
         logging.info(f"Expected error rate: {self.params.epsilon:.4f}")
         logging.info(f"Error probability: {self.params.delta:.4f}")
 
-    def _get_hash_indices(self, item: str) -> List[int]:
+    def _get_hash_indices(self, item: str) -> Tuple[List[int], List[int]]:
         """
-        Generate hash indices for an item using MurmurHash3.
+        Generate the block and in-block counter indices for an item.
+        A single 128-bit MurmurHash3 call yields (h1, h2): the top 32 bits
+        of h1 pick the group as (h1 >> 32) * num_groups >> 32. Block j of
+        the group takes a 6-bit seed from h2 and its rows use lanes
+        (start + r*step) & 7 with an odd step, so they are always distinct.
         
         Args:
             item: Item to hash
             
         Returns:
-            List of hash indices
+            Tuple of (list of block indices, list of lane indices), one per row
+        """
+        h1, h2 = mmh3.hash64(_encode(item), signed=False)
+        lane_mask = self.BLOCK_SIZE - 1
+        seed_shift = 64 - 2 * self.LANE_BITS
+        base = ((h1 >> 32) * self.num_groups >> 32) * self.group_blocks
+        blocks, lanes = [], []
+        for j, multiplier in enumerate(self._seed_multipliers):
+            # Only bits below 64 of the product matter, as with wrapping uint64
+            seed = (h2 * multiplier >> seed_shift) & ((1 << 2 * self.LANE_BITS) - 1)
+            start = seed & lane_mask
+            step = (seed >> self.LANE_BITS) | 1
+            for r in range(min(self.BLOCK_SIZE, self.depth - j * self.BLOCK_SIZE)):
+                blocks.append(base + j)
+                lanes.append((start + r * step) & lane_mask)
+        return blocks, lanes
+
+    def _get_batch_hash_indices(self, items: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized _get_hash_indices.
+        
+        Args:
+            items: Items to hash
+            
+        Returns:
+            Tuple of (N, depth) block indices and (N, depth) lane indices
         """
-        indices = []
-        for seed in range(self.depth):
-            hash_val = mmh3.hash(str(item), seed) % self.width
-            indices.append(abs(hash_val))
-        return indices
+        hashes = np.fromiter(
+            (mmh3.hash64(_encode(item), signed=False) for item in items),
+            dtype=[('h1', np.uint64), ('h2', np.uint64)],
+            count=len(items),
+        )
+        lane_mask = np.uint64(self.BLOCK_SIZE - 1)
+        multipliers = np.array(self._seed_multipliers, dtype=np.uint64)
+        seeds = (hashes['h2'][:, None] * multipliers) >> np.uint64(64 - 2 * self.LANE_BITS)
+        seeds = seeds[:, self._row_blocks]
+        start = seeds & lane_mask
+        step = (seeds >> np.uint64(self.LANE_BITS)) | np.uint64(1)
+        lanes = (start + self._row_positions.astype(np.uint64) * step) & lane_mask
+        groups = ((hashes['h1'] >> np.uint64(32)) * np.uint64(self.num_groups)) >> np.uint64(32)
+        blocks = groups.astype(np.int64)[:, None] * self.group_blocks + self._row_blocks
+        return blocks, lanes.astype(np.int64)
 
     def add(self, item: str, count: int = 1) -> None:
         """
@@ -90,11 +211,28 @@ class CountMinSketch:
         if count <= 0:
             raise ValueError("Count must be positive")
             
-        indices = self._get_hash_indices(item)
-        for i, index in enumerate(indices):
-            self.sketch[i][index] += count
+        blocks, lanes = self._get_hash_indices(item)
+        # (block, lane) pairs are distinct, so a plain fancy-indexed update is safe
+        self.sketch[blocks, lanes] += count
         self.total_items += count
 
+    def add_batch(self, items: List[str], count: int = 1) -> None:
+        """
+        Add many items to the sketch, each with the same count.
+        
+        Args:
+            items: Items to add
+            count: Count to add per item (default: 1)
+        """
+        if count <= 0:
+            raise ValueError("Count must be positive")
+        if not items:
+            return
+            
+        blocks, lanes = self._get_batch_hash_indices(items)
+        np.add.at(self.sketch, (blocks.ravel(), lanes.ravel()), count)
+        self.total_items += count * len(items)
+
     def get_count(self, item: str) -> Tuple[int, float]:
         """
         Get the estimated count of an item.
@@ -105,8 +243,8 @@ class CountMinSketch:
         Returns:
             Tuple of (estimated_count, error_bound)
         """
-        indices = self._get_hash_indices(item)
-        estimated_count = min(self.sketch[i][index] for i, index in enumerate(indices))
+        blocks, lanes = self._get_hash_indices(item)
+        estimated_count = int(self.sketch[blocks, lanes].min())
         error_bound = self.total_items * self.params.epsilon
         
         return estimated_count, error_bound
@@ -140,22 +278,13 @@ class CMSDataProcessor:
             if not file_path.exists():
                 raise FileNotFoundError(f"CSV file not found: {file_path}")
 
-            with open(file_path, 'r') as file:
-                reader = csv.DictReader(file) if column_name else csv.reader(file)
-                
-                if column_name and column_name not in reader.fieldnames:
-                    raise ValueError(f"Column '{column_name}' not found in CSV file")
-
-                processed = 0
-                for row in reader:
-                    value = row[column_name] if column_name else row[0]
-                    self.cms.add(str(value))
-                    
-                    processed += 1
-                    if processed % batch_size == 0:
-                        logging.info(f"Processed {processed} items")
-
-                logging.info(f"Finished processing {processed} items")
+            processed = 0
+            for batch in _read_csv_batches(file_path, column_name, batch_size):
+                self.cms.add_batch(batch)
+                processed += len(batch)
+                logging.info(f"Processed {processed} items")
+
+            logging.info(f"Finished processing {processed} items")
 
         except Exception as e:
             logging.error(f"Error processing CSV file: {str(e)}")
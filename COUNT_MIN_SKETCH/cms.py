@@ -1,49 +1,38 @@
 #i made 4 hash function for counting the frequency of a number in a stream of numbers
+import numpy as np
 
-hashtable = [[0] * 5 for _ in range(4)]  
+hashtable = np.zeros((4, 5), dtype=np.int64)
 
-def cms(a):
-    hash1 = pow(a * 5, 3) % 5
-    hash2 = (a * 2) % 5
-    hash3 = (a * 45 - 342) % 5
-    hash4 = ((a + 23) - a * 2) % 5
+# row r hashes a to (A[r] * a + B[r]) % 5, which is what the 4 hash functions were:
+# pow(a * 5, 3) % 5 is always 0, (a * 2) % 5, (a * 45 - 342) % 5, ((a + 23) - a * 2) % 5
+A = np.array([0, 2, 45, -1], dtype=np.int64)
+B = np.array([0, 0, -342, 23], dtype=np.int64)
+ROWS = np.arange(4)
 
-    hash1 = abs(hash1)
-    hash2 = abs(hash2)
-    hash3 = abs(hash3)
-    hash4 = abs(hash4)
+def hashes(a):
+    # every row is affine mod 5, so reducing a first is exact and keeps int64 from wrapping;
+    # numpy % takes the sign of the divisor like python, so columns are already 0..4
+    return (A * (a % 5) + B) % 5
 
+def cms(a):
+    hashtable[ROWS, hashes(a)] += 1
 
-    hashtable[0][hash1] += 1
-    hashtable[1][hash2] += 1
-    hashtable[2][hash3] += 1
-    hashtable[3][hash4] += 1
+def cms_batch(values):
+    # all 4 hashes of every value in one go, then one scatter-add (repeats are counted)
+    # reduce before the int64 cast; python ints past int64 come in as an object array
+    values = (np.asarray(values) % 5).astype(np.int64)
+    cols = (A[:, None] * values[None, :] + B[:, None]) % 5
+    np.add.at(hashtable, (ROWS[:, None], cols), 1)
 
 def get_count(a):
-    hash1 = pow(a * 5, 3) % 5
-    hash2 = (a * 2) % 5
-    hash3 = (a * 45 - 342) % 5
-    hash4 = ((a + 23) - a * 2) % 5
-
-    hash1 = abs(hash1)
-    hash2 = abs(hash2)
-    hash3 = abs(hash3)
-    hash4 = abs(hash4)
-
-    arr = [
-        hashtable[0][hash1],
-        hashtable[1][hash2],
-        hashtable[2][hash3],
-        hashtable[3][hash4],
-    ]
-    print("Probable count is", min(arr))
+    print("Probable count is", hashtable[ROWS, hashes(a)].min())
 
 if __name__ == "__main__":
     a = int(input("Enter number to count (press -1 to exit): "))
     while a != -1:
         cms(a)
         a = int(input("Enter number to count (press -1 to exit): "))
-    
+
     b = int(input("To get the count of (press -1 to exit): "))
     while b != -1:
         get_count(b)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from COUNT_MIN_SKETCH import CMSParameters, CountMinSketch, _read_csv_batches
+
+
+def _sketch(delta=0.01):
+    return CountMinSketch(CMSParameters.from_error_rate(0.01, delta))
+
+
+@pytest.mark.parametrize("delta", [0.01, 1e-4])
+def test_add_batch_matches_add(delta):
+    items = [f"item{i % 300}" for i in range(2000)]
+    scalar, batch = _sketch(delta), _sketch(delta)
+    for item in items:
+        scalar.add(item, 3)
+    batch.add_batch(items, 3)
+
+    np.testing.assert_array_equal(scalar.sketch, batch.sketch)
+    assert scalar.total_items == batch.total_items
+
+
+def test_counts_past_int32_stay_exact():
+    cms = _sketch()
+    cms.add("big", 2**31)
+    cms.add("big", 2**31)
+    assert cms.get_count("big")[0] == 2**32
+
+
+def test_counters_match_width_times_depth():
+    cms = _sketch()
+    assert (cms.width, cms.depth) == (272, 5)
+    assert cms.sketch.size == 1360
+
+
+def test_deep_sketch_spans_adjacent_blocks():
+    cms = _sketch(1e-4)
+    assert cms.depth == 10 and cms.group_blocks == 2
+
+    items = [f"item{i}" for i in range(5000)]
+    cms.add_batch(items)
+    cms.add("heavy", 1000)
+
+    blocks, lanes = cms._get_hash_indices("heavy")
+    assert len(set(zip(blocks, lanes))) == cms.depth
+    assert max(blocks) - min(blocks) == 1
+    assert cms.get_count("heavy")[0] >= 1000
+    estimates = [cms.get_count(item)[0] for item in items[:500]]
+    assert min(estimates) >= 1
+    error_bound = cms.total_items * cms.params.epsilon
+    assert np.mean(np.array(estimates) - 1 <= error_bound) >= 0.99
+
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+@pytest.mark.parametrize("column_name, tail", [(None, ["1", "3", "5"]), ("", ["1", "3", "5"]),
+                                               ("a", ["1", "3", "5"]), ("b", ["2", None, "6"])])
+def test_read_csv_batches_handles_ragged_rows(tmp_path, monkeypatch, use_pyarrow, column_name, tail):
+    if use_pyarrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr("COUNT_MIN_SKETCH.pa_csv", None)
+    # Over a megabyte (one pyarrow block) before the short row, so csv has to resume mid-file
+    rows = 40000
+    path = tmp_path / "ragged.csv"
+    path.write_text("a,b\n" + "".join(f"{i:030d},{i}\n" for i in range(rows)) + "1,2\n3\n5,6\n")
+
+    values = [v for batch in _read_csv_batches(path, column_name, 1000) for v in batch]
+
+    header = 0 if column_name else 1
+    assert len(values) == header + rows + 3
+    assert values[-3:] == tail
@@ -1,18 +1,79 @@
 import math
 import mmh3
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 import numpy as np
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import csv
 from pathlib import Path
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the csv module
+    pa = pa_csv = None
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# 2**-r for every possible register value, so estimates gather instead of pow
+_POW2NEG = 2.0 ** -np.arange(64, dtype=np.float64)
+
+def _encode(item) -> bytes:
+    """
+    Convert an item to the UTF-8 bytes that get hashed. bytes pass through
+    as-is, so b'x' and 'x' hash alike.
+    """
+    return item if isinstance(item, bytes) else str(item).encode('utf-8')
+
+def _read_csv_batches(file_path: Path, column_name: Optional[str],
+                      batch_size: int) -> Iterator[List[str]]:
+    """
+    Yield the values of one CSV column in lists of at most batch_size.
+    Uses pyarrow's C++ reader when it is installed, otherwise csv. Without
+    column_name the first column is used and, as with csv.reader, the header
+    row is read as data.
+    """
+    read = 0
+    if pa_csv is not None:
+        column = column_name or 'f0'
+        read_options = pa_csv.ReadOptions(autogenerate_column_names=not column_name)
+        convert_options = pa_csv.ConvertOptions(include_columns=[column],
+                                                column_types={column: pa.string()})
+        try:
+            reader = pa_csv.open_csv(file_path, read_options=read_options,
+                                     convert_options=convert_options)
+            for record_batch in reader:
+                values = record_batch.column(0).to_pylist()
+                for start in range(0, len(values), batch_size):
+                    batch = values[start:start + batch_size]
+                    read += len(batch)
+                    yield batch
+            return
+        except pa.ArrowKeyError:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+        except pa.ArrowInvalid:
+            # pyarrow rejects rows with the wrong number of fields, which csv
+            # reads (a short row gives None for a missing column), so csv
+            # takes over from the first value pyarrow did not yield
+            pass
+
+    with open(file_path, 'r') as file:
+        reader = csv.DictReader(file) if column_name else csv.reader(file)
+        
+        if column_name and column_name not in reader.fieldnames:
+            raise ValueError(f"Column '{column_name}' not found in CSV file")
+
+        values = islice((row[column_name] if column_name else row[0] for row in reader), read, None)
+        batch = list(islice(values, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(values, batch_size))
+
 @dataclass
 class EstimatorParams:
     """Parameters for cardinality estimators."""
@@ -32,15 +93,23 @@ class EstimatorParams:
 class BaseLogEstimator(ABC):
     """Base class for LogLog-based cardinality estimators."""
     
-    def __init__(self, precision: int):
+    def __init__(self, precision: int, registers: Optional[np.ndarray] = None):
         """
         Initialize estimator.
         
         Args:
             precision: Number of bits for register indexing
+            registers: Existing register array to share with other estimators.
+                       LogLog, SuperLogLog and HyperLogLog use the same update
+                       and differ only in estimate(), so one array can back all three.
         """
         self.params = EstimatorParams.from_precision(precision)
-        self.registers = np.zeros(self.params.num_registers, dtype=np.int8)
+        if registers is None:
+            # Register values are bounded by 32 - precision + 1, so one unsigned byte each
+            registers = np.zeros(self.params.num_registers, dtype=np.uint8)
+        elif registers.shape != (self.params.num_registers,) or registers.dtype != np.uint8:
+            raise ValueError(f"Registers must be a uint8 array of length {self.params.num_registers}")
+        self.registers = registers
         self.alpha = self._get_alpha(self.params.num_registers)
         
         logging.info(f"Initialized {self.__class__.__name__} with {self.params.num_registers} registers")
@@ -57,23 +126,40 @@ class BaseLogEstimator(ABC):
         else:
             return 0.7213 / (1 + 1.079 / m)
     
-    def _hash(self, item: str) -> int:
-        """Generate 32-bit hash for item."""
-        return mmh3.hash(str(item), signed=False)
-    
-    def _get_register_index(self, hash_value: int) -> int:
-        """Extract register index from hash value."""
-        return hash_value & (self.params.num_registers - 1)
-    
-    def _get_leading_zeros(self, hash_value: int) -> int:
-        """Count leading zeros in remaining hash bits."""
-        value = hash_value >> self.params.precision
-        return min(32 - self.params.precision, (value | 1).bit_length() - 1)
-    
-    @abstractmethod
     def add(self, item: str) -> None:
-        """Add item to estimator."""
-        pass
+        """
+        Add item to estimator.
+        
+        The low precision bits of the 32-bit hash pick the register; the rank
+        is the leading-zero count of the remaining bits plus one.
+        
+        Args:
+            item: Item to add
+        """
+        precision = self.params.precision
+        hash_val = mmh3.hash(_encode(item), signed=False)
+        idx = hash_val & (self.params.num_registers - 1)
+        zeros = 32 - precision - (hash_val >> precision).bit_length() + 1
+        if zeros > self.registers[idx]:
+            self.registers[idx] = zeros
+    
+    def add_batch(self, items: List[str]) -> None:
+        """
+        Add many items at once with the same register update as add().
+        
+        Args:
+            items: Items to add
+        """
+        if not items:
+            return
+        hashes = np.fromiter((mmh3.hash(_encode(item), signed=False) for item in items),
+                             dtype=np.uint32, count=len(items))
+        idx = hashes & np.uint32(self.params.num_registers - 1)
+        rest = hashes >> np.uint32(self.params.precision)
+        # frexp's exponent is the bit length of an integer (0 for 0), exact below 2**53
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        zeros = (32 - self.params.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, zeros)
     
     @abstractmethod
     def estimate(self) -> int:
@@ -83,18 +169,6 @@ class BaseLogEstimator(ABC):
 class LogLog(BaseLogEstimator):
     """LogLog cardinality estimator."""
     
-    def add(self, item: str) -> None:
-        """
-        Add item to LogLog estimator.
-        
-        Args:
-            item: Item to add
-        """
-        hash_val = self._hash(item)
-        idx = self._get_register_index(hash_val)
-        zeros = self._get_leading_zeros(hash_val)
-        self.registers[idx] = max(self.registers[idx], zeros)
-    
     def estimate(self) -> int:
         """
         Estimate cardinality using LogLog algorithm.
@@ -102,35 +176,25 @@ class LogLog(BaseLogEstimator):
         Returns:
             Estimated cardinality
         """
-        harmonic_mean = 1 / np.mean(2.0 ** -self.registers)
+        harmonic_mean = 1 / np.mean(_POW2NEG[self.registers])
         return int(self.alpha * self.params.num_registers * harmonic_mean)
 
 class SuperLogLog(BaseLogEstimator):
     """SuperLogLog cardinality estimator with truncation."""
     
-    def __init__(self, precision: int, truncate_percentage: float = 0.7):
+    def __init__(self, precision: int, truncate_percentage: float = 0.7,
+                 registers: Optional[np.ndarray] = None):
         """
         Initialize SuperLogLog estimator.
         
         Args:
             precision: Number of bits for register indexing
             truncate_percentage: Percentage of largest values to truncate
+            registers: Existing register array to share with other estimators
         """
-        super().__init__(precision)
+        super().__init__(precision, registers)
         self.truncate_threshold = int(self.params.num_registers * truncate_percentage)
     
-    def add(self, item: str) -> None:
-        """
-        Add item to SuperLogLog estimator.
-        
-        Args:
-            item: Item to add
-        """
-        hash_val = self._hash(item)
-        idx = self._get_register_index(hash_val)
-        zeros = self._get_leading_zeros(hash_val)
-        self.registers[idx] = max(self.registers[idx], zeros)
-    
     def estimate(self) -> int:
         """
         Estimate cardinality using SuperLogLog algorithm.
@@ -138,26 +202,14 @@ class SuperLogLog(BaseLogEstimator):
         Returns:
             Estimated cardinality
         """
-        sorted_registers = np.sort(self.registers)
-        truncated_registers = sorted_registers[:self.truncate_threshold]
-        harmonic_mean = 1 / np.mean(2.0 ** -truncated_registers)
+        # Only the smallest truncate_threshold values are needed, not a full sort
+        truncated_registers = np.partition(self.registers, self.truncate_threshold - 1)[:self.truncate_threshold]
+        harmonic_mean = 1 / np.mean(_POW2NEG[truncated_registers])
         return int(self.alpha * self.params.num_registers * harmonic_mean)
 
 class HyperLogLog(BaseLogEstimator):
     """HyperLogLog cardinality estimator."""
     
-    def add(self, item: str) -> None:
-        """
-        Add item to HyperLogLog estimator.
-        
-        Args:
-            item: Item to add
-        """
-        hash_val = self._hash(item)
-        idx = self._get_register_index(hash_val)
-        zeros = self._get_leading_zeros(hash_val)
-        self.registers[idx] = max(self.registers[idx], zeros)
-    
     def estimate(self) -> int:
         """
         Estimate cardinality using HyperLogLog algorithm.
@@ -165,7 +217,7 @@ class HyperLogLog(BaseLogEstimator):
         Returns:
             Estimated cardinality
         """
-        harmonic_mean = 1 / np.mean(2.0 ** -self.registers)
+        harmonic_mean = 1 / np.mean(_POW2NEG[self.registers])
         estimate = self.alpha * self.params.num_registers * harmonic_mean
         
         # Apply corrections for small and large ranges
@@ -188,9 +240,19 @@ class CardinalityProcessor:
         Args:
             precision: Precision bits for estimators
         """
-        self.loglog = LogLog(precision)
-        self.superloglog = SuperLogLog(precision)
+        # One register array, updated once per item, backs all three estimates
         self.hyperloglog = HyperLogLog(precision)
+        self.loglog = LogLog(precision, registers=self.hyperloglog.registers)
+        self.superloglog = SuperLogLog(precision, registers=self.hyperloglog.registers)
+    
+    def process_batch(self, items: List[str]) -> None:
+        """
+        Process a batch of items through all estimators.
+        
+        Args:
+            items: Items to process
+        """
+        self.hyperloglog.add_batch(items)
     
     def process_item(self, item: str) -> None:
         """
@@ -199,8 +261,6 @@ class CardinalityProcessor:
         Args:
             item: Item to process
         """
-        self.loglog.add(item)
-        self.superloglog.add(item)
         self.hyperloglog.add(item)
     
     def process_csv(self, file_path: str, column_name: Optional[str] = None,
@@ -218,22 +278,13 @@ class CardinalityProcessor:
             if not file_path.exists():
                 raise FileNotFoundError(f"CSV file not found: {file_path}")
             
-            with open(file_path, 'r') as file:
-                reader = csv.DictReader(file) if column_name else csv.reader(file)
-                
-                if column_name and column_name not in reader.fieldnames:
-                    raise ValueError(f"Column '{column_name}' not found in CSV file")
-                
-                processed = 0
-                for row in reader:
-                    value = row[column_name] if column_name else row[0]
-                    self.process_item(str(value))
-                    
-                    processed += 1
-                    if processed % batch_size == 0:
-                        self._log_estimates(processed)
-                
+            processed = 0
+            for batch in _read_csv_batches(file_path, column_name, batch_size):
+                self.process_batch(batch)
+                processed += len(batch)
                 self._log_estimates(processed)
+            
+            self._log_estimates(processed)
         
         except Exception as e:
             logging.error(f"Error processing CSV file: {str(e)}")
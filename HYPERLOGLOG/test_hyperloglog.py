@@ -0,0 +1,77 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import HYPERLOGLOG
+from HYPERLOGLOG import CardinalityProcessor, HyperLogLog, _read_csv_batches
+
+
+def test_add_batch_matches_add():
+    items = [f"item{i}" for i in range(5000)]
+    scalar, batch = HyperLogLog(10), HyperLogLog(10)
+    for item in items:
+        scalar.add(item)
+    batch.add_batch(items)
+
+    np.testing.assert_array_equal(scalar.registers, batch.registers)
+
+
+def test_add_batch_matches_add_when_remaining_bits_are_zero(monkeypatch):
+    precision = 4
+    # Register index 5 with no bits above it, index 3 with only the top bit set,
+    # and index 7 with only the lowest remaining bit set
+    hashes = {b"zero": 5, b"top": (1 << 31) | 3, b"low": (1 << precision) | 7}
+    monkeypatch.setattr(HYPERLOGLOG, "mmh3",
+                        SimpleNamespace(hash=lambda data, signed=False: hashes[data]))
+    scalar, batch = HyperLogLog(precision), HyperLogLog(precision)
+    for item in hashes:
+        scalar.add(item)
+    batch.add_batch(list(hashes))
+
+    np.testing.assert_array_equal(scalar.registers, batch.registers)
+    assert scalar.registers[5] == 32 - precision + 1
+    assert scalar.registers[3] == 1
+    assert scalar.registers[7] == 32 - precision
+
+
+@pytest.mark.parametrize("n", [1000, 100000])
+def test_hyperloglog_estimate_is_within_standard_error(n):
+    precision = 10
+    hll = HyperLogLog(precision)
+    hll.add_batch([f"user{i}" for i in range(n)])
+
+    standard_error = 1.04 / math.sqrt(1 << precision)
+    assert abs(hll.estimate() - n) <= 3 * standard_error * n
+
+
+def test_processor_estimators_share_registers():
+    processor = CardinalityProcessor(precision=8)
+    processor.process_batch([f"item{i}" for i in range(100)])
+    processor.process_item("one more")
+
+    registers = processor.hyperloglog.registers
+    assert processor.loglog.registers is registers
+    assert processor.superloglog.registers is registers
+    assert registers.any()
+
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+@pytest.mark.parametrize("column_name, tail", [(None, ["1", "3", "5"]), ("", ["1", "3", "5"]),
+                                               ("a", ["1", "3", "5"]), ("b", ["2", None, "6"])])
+def test_read_csv_batches_handles_ragged_rows(tmp_path, monkeypatch, use_pyarrow, column_name, tail):
+    if use_pyarrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr("HYPERLOGLOG.pa_csv", None)
+    # Over a megabyte (one pyarrow block) before the short row, so csv has to resume mid-file
+    rows = 40000
+    path = tmp_path / "ragged.csv"
+    path.write_text("a,b\n" + "".join(f"{i:030d},{i}\n" for i in range(rows)) + "1,2\n3\n5,6\n")
+
+    values = [v for batch in _read_csv_batches(path, column_name, 1000) for v in batch]
+
+    header = 0 if column_name else 1
+    assert len(values) == header + rows + 3
+    assert values[-3:] == tail
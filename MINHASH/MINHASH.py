@@ -1,5 +1,42 @@
-import random
-from typing import List, Set, Callable
+import numpy as np
+from typing import Set, Tuple
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to the plain Python loops
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+_MERSENNE_PRIME = (1 << 31) - 1  # Large prime number for modulo
+
+@njit(cache=True)
+def _mod_mersenne(t):
+    """t % (2**31 - 1) for uint64 t without a division: x mod 2**31 - 1 == (x & p) + (x >> 31)."""
+    p = np.uint64(_MERSENNE_PRIME)
+    shift = np.uint64(31)
+    t = (t & p) + (t >> shift)  # < 2**34
+    t = (t & p) + (t >> shift)  # < p + 8
+    if t >= p:
+        t -= p
+    return t
+
+@njit(cache=True, parallel=True)
+def _signature_kernel(a, b, item_hashes):
+    """Minimum of (a[j] * x + b[j]) % p over all item hashes x, for every j."""
+    p = np.uint64(_MERSENNE_PRIME)
+    signature = np.empty(a.shape[0], dtype=np.uint64)
+    for j in prange(a.shape[0]):
+        min_hash_value = p
+        for i in range(item_hashes.shape[0]):
+            value = _mod_mersenne(a[j] * item_hashes[i] + b[j])
+            if value < min_hash_value:
+                min_hash_value = value
+        signature[j] = min_hash_value
+    return signature
 
 class MinHash:
     def __init__(self, num_hashes: int) -> None:
@@ -10,25 +47,22 @@ class MinHash:
             num_hashes (int): Number of hash functions to use.
         """
         self.num_hashes = num_hashes
-        self.hash_functions = self._generate_hash_functions()
+        self.a, self.b = self._generate_hash_params()
 
-    def _generate_hash_functions(self) -> List[Callable[[str], int]]:
+    def _generate_hash_params(self) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generates a list of hash functions. Each hash function is simulated
-        using a random linear transformation: (a * x + b) % p.
+        Generates the parameters of the hash functions. Each hash function is
+        a random linear transformation (a * x + b) % p, stored as one entry
+        of the a and b arrays so the signature can be computed in one kernel.
 
         Returns:
-            List[Callable[[str], int]]: List of hash functions.
+            Tuple[np.ndarray, np.ndarray]: Multipliers a and offsets b.
         """
-        max_value = 2**31 - 1  # Large prime number for modulo
-        hash_functions = []
-        for _ in range(self.num_hashes):
-            a = random.randint(1, max_value)
-            b = random.randint(0, max_value)
-            hash_functions.append(lambda x, a=a, b=b, p=max_value: (a * hash(x) + b) % p)
-        return hash_functions
-
-    def compute_signature(self, input_set: Set[str]) -> List[int]:
+        a = np.random.randint(1, _MERSENNE_PRIME, self.num_hashes, dtype=np.uint64)
+        b = np.random.randint(0, _MERSENNE_PRIME, self.num_hashes, dtype=np.uint64)
+        return a, b
+
+    def compute_signature(self, input_set: Set[str]) -> np.ndarray:
         """
         Computes the MinHash signature for the given set.
         
@@ -36,13 +70,17 @@ class MinHash:
             input_set (Set[str]): The set for which to compute the signature.
         
         Returns:
-            List[int]: MinHash signature as a list of minimum hash values.
+            np.ndarray: MinHash signature as a uint64 array of minimum hash values.
+        
+        Raises:
+            ValueError: If input_set is empty, since it has no minimum hash values.
         """
-        signature = []
-        for hash_func in self.hash_functions:
-            min_hash_value = min(hash_func(item) for item in input_set)
-            signature.append(min_hash_value)
-        return signature
+        if not input_set:
+            raise ValueError("Cannot compute a MinHash signature of an empty set")
+        # 32-bit item hashes keep a * x + b below 2**63, so uint64 never overflows
+        item_hashes = np.fromiter((hash(item) & 0xFFFFFFFF for item in input_set),
+                                  dtype=np.uint64, count=len(input_set))
+        return _signature_kernel(self.a, self.b, item_hashes)
 
     @staticmethod
     def compute_jaccard_similarity(set_a: Set[str], set_b: Set[str]) -> float:
@@ -61,19 +99,18 @@ class MinHash:
         return intersection / union if union != 0 else 0.0
 
     @staticmethod
-    def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    def estimate_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
         """
         Estimates the similarity between two sets based on their MinHash signatures.
         
         Args:
-            signature_a (List[int]): MinHash signature of the first set.
-            signature_b (List[int]): MinHash signature of the second set.
+            signature_a (np.ndarray): MinHash signature of the first set.
+            signature_b (np.ndarray): MinHash signature of the second set.
         
         Returns:
             float: Estimated Jaccard similarity.
         """
-        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
-        return matches / len(signature_a)
+        return float(np.mean(np.asarray(signature_a) == np.asarray(signature_b)))
 
 
 if __name__ == "__main__":
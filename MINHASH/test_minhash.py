@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from MINHASH import MinHash
+
+
+def test_empty_set_has_no_signature():
+    with pytest.raises(ValueError):
+        MinHash(16).compute_signature(set())
+
+
+def test_mod_mersenne_matches_modulo():
+    from MINHASH import _MERSENNE_PRIME as p, _mod_mersenne
+
+    rng = np.random.default_rng(0)
+    edge = [0, 1, p - 1, p, p + 1, 2 * p - 1, 2 * p, 2 * p + 1, 1 << 31, (1 << 31) + 1,
+            p * p, (1 << 62) - 1, 1 << 62, (1 << 63) - 1, 1 << 63, (1 << 64) - 1]
+    randoms = rng.integers(0, 1 << 63, 10000, dtype=np.uint64).tolist()
+    for t in edge + randoms:
+        assert int(_mod_mersenne(np.uint64(t))) == t % p, t
+
+
+def test_signature_matches_python_reference():
+    from MINHASH import _MERSENNE_PRIME as p
+
+    minhash = MinHash(64)
+    items = {f"word{i}" for i in range(200)}
+    expected = [min((int(a) * (hash(item) & 0xFFFFFFFF) + int(b)) % p for item in items)
+                for a, b in zip(minhash.a, minhash.b)]
+    assert minhash.compute_signature(items).tolist() == expected